@@ -161,5 +161,5 @@ echo "============================================"
 echo "Done. Output: ${OUTPUT_DIR}/"
 echo ""
 echo "Note: RFD3 outputs .cif.gz files. Convert to PDB for downstream"
-echo "ProteinMPNN with PyMOL: pymol -cq convert_to_pdb.py"
+echo "ProteinMPNN: python ../02_proteinmpnn/convert_cif_to_pdb.py"
 echo "============================================"
@@ -3,67 +3,91 @@
 Convert RFdiffusion3 CIF.GZ outputs to PDB format for ProteinMPNN.
 
 RFdiffusion3 (Foundry) outputs .cif.gz files. ProteinMPNN requires .pdb input.
-This script uses PyMOL to batch-convert all CIF.GZ files to PDB.
+This script uses gemmi to batch-convert all CIF.GZ files to PDB, one file per
+worker process.
 
 Usage:
-    pymol -cq convert_cif_to_pdb.py -- <input_dir> <output_dir>
+    python convert_cif_to_pdb.py <input_dir> <output_dir> [n_workers]
 
 Example:
-    pymol -cq convert_cif_to_pdb.py -- ../01_rfdiffusion3/outputs ./inputs_rfd3
+    python convert_cif_to_pdb.py ../01_rfdiffusion3/outputs ./inputs_rfd3
 """
 
 import sys
 import os
+from multiprocessing import Pool
 from pathlib import Path
-from pymol import cmd
-
-# --- Parse arguments (after '--' in pymol -cq script.py -- args) ---
-argv = sys.argv[1:]
-if len(argv) < 2:
-    print("Usage: pymol -cq convert_cif_to_pdb.py -- <input_dir> <output_dir>")
-    sys.exit(1)
-
-IN_DIR = Path(argv[0])
-OUT_DIR = Path(argv[1])
-OUT_DIR.mkdir(parents=True, exist_ok=True)
-
-if not IN_DIR.exists():
-    print(f"ERROR: Input directory not found: {IN_DIR}")
-    sys.exit(1)
-
-# --- Convert all CIF.GZ files ---
-cif_files = sorted(IN_DIR.rglob("*.cif.gz"))
-print(f"Found {len(cif_files)} CIF.GZ files in {IN_DIR}")
-
-converted = 0
-skipped = 0
-failed = 0
-
-for cif_path in cif_files:
-    # Output PDB: flatten directory structure, replace extension
-    stem = cif_path.name.replace(".cif.gz", "")
-    # Include parent folder name if nested (e.g., task subdirectories)
-    if cif_path.parent != IN_DIR:
-        parent_name = cif_path.parent.name
-        out_name = f"{stem}_{parent_name}.pdb"
-    else:
-        out_name = f"{stem}.pdb"
-
-    out_pdb = OUT_DIR / out_name
-
-    if out_pdb.exists() and out_pdb.stat().st_size > 0:
-        skipped += 1
-        continue
-
-    obj_name = f"obj_{converted}"
+
+import gemmi
+
+
+def _convert(task):
+    """Convert a single CIF.GZ file to PDB. Returns (cif_path, error or None)."""
+    cif_path, out_pdb = task
     try:
-        cmd.load(str(cif_path), obj_name)
-        cmd.save(str(out_pdb), obj_name)
-        cmd.delete(obj_name)
-        converted += 1
+        structure = gemmi.read_structure(str(cif_path))
+        structure.write_pdb(str(out_pdb))
     except Exception as e:
-        print(f"[FAIL] {cif_path}: {e}")
-        failed += 1
+        return cif_path, e
+    return cif_path, None
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python convert_cif_to_pdb.py <input_dir> <output_dir> [n_workers]")
+        sys.exit(1)
+
+    in_dir = Path(sys.argv[1])
+    out_dir = Path(sys.argv[2])
+    n_workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+
+    if not in_dir.exists():
+        print(f"ERROR: Input directory not found: {in_dir}")
+        sys.exit(1)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # --- Collect CIF.GZ files ---
+    cif_files = sorted(in_dir.rglob("*.cif.gz"))
+    print(f"Found {len(cif_files)} CIF.GZ files in {in_dir}")
+
+    tasks = []
+    skipped = 0
+
+    for cif_path in cif_files:
+        # Output PDB: flatten directory structure, replace extension
+        stem = cif_path.name.replace(".cif.gz", "")
+        # Include parent folder name if nested (e.g., task subdirectories)
+        if cif_path.parent != in_dir:
+            parent_name = cif_path.parent.name
+            out_name = f"{stem}_{parent_name}.pdb"
+        else:
+            out_name = f"{stem}.pdb"
+
+        out_pdb = out_dir / out_name
+
+        if out_pdb.exists() and out_pdb.stat().st_size > 0:
+            skipped += 1
+            continue
+
+        tasks.append((cif_path, out_pdb))
+
+    # --- Convert in parallel (CPU-bound, one process per worker) ---
+    converted = 0
+    failed = 0
+
+    if tasks:
+        with Pool(n_workers) as pool:
+            for cif_path, err in pool.imap_unordered(_convert, tasks, chunksize=16):
+                if err is None:
+                    converted += 1
+                else:
+                    print(f"[FAIL] {cif_path}: {err}")
+                    failed += 1
+
+    print(f"\nConversion complete: {converted} converted, {skipped} skipped, {failed} failed")
+    print(f"Output: {out_dir}")
+
 
-print(f"\nConversion complete: {converted} converted, {skipped} skipped, {failed} failed")
-print(f"Output: {OUT_DIR}")
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@
 # Prerequisites:
 #   conda activate mlfold
 #   ProteinMPNN installed: https://github.com/dauparas/ProteinMPNN
+#   gemmi (rfd3 only): pip install gemmi
 #
 # Usage:
 #   conda activate mlfold
@@ -80,7 +81,7 @@ if [ ! -f "${PROTEINMPNN_PATH}/protein_mpnn_run.py" ]; then
 fi
 
 # =============================================================================
-# RFD3 only: Convert CIF.GZ to PDB using PyMOL
+# RFD3 only: Convert CIF.GZ to PDB using gemmi (parallel)
 # =============================================================================
 
 if [ "$SOURCE" == "rfd3" ]; then
@@ -91,10 +92,10 @@ if [ "$SOURCE" == "rfd3" ]; then
     fi
 
     echo "============================================"
-    echo "Converting RFD3 CIF.GZ to PDB (PyMOL)..."
+    echo "Converting RFD3 CIF.GZ to PDB (gemmi)..."
     echo "============================================"
 
-    pymol -cq convert_cif_to_pdb.py -- "$RFD3_RAW_DIR" "$INPUT_DIR"
+    python convert_cif_to_pdb.py "$RFD3_RAW_DIR" "$INPUT_DIR"
 
     echo ""
 fi
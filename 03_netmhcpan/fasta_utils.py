@@ -0,0 +1,97 @@
+"""
+Shared FASTA helpers for the NetMHCpan step scripts.
+
+Imported by prepare_sequences.py and filter_binders.py, which are run from
+this directory. Gzipped inputs are read transparently, via pigz when it is
+on PATH.
+"""
+
+import os
+import gzip
+import shutil
+import subprocess
+from contextlib import contextmanager
+
+READ_BUFFER = 1 << 20  # 1 MB read buffer for FASTA / result files
+PIPE_BUFFER = 1 << 22  # 4 MB pipe buffer for pigz output
+FASTA_SUFFIXES = (".fa", ".fa.gz")
+WHITESPACE = b" \t\r\n"
+
+
+def walk_fasta(root: str, suffixes=FASTA_SUFFIXES):
+    """Yield (directory, filename) for FASTA files under root.
+
+    Traversal is depth-first with names sorted per directory. Yielding the
+    directory string lets callers derive per-directory data once and build
+    file paths by plain concatenation.
+
+    Uses os.scandir so file/directory checks come from cached DirEntry data
+    instead of extra stat() calls. Symlinked directories are not followed,
+    matching os.walk defaults.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.name.lower().endswith(suffixes):
+                yield directory, entry.name
+        # Reverse so subdirectories are visited in sorted order
+        stack.extend(reversed(subdirs))
+
+
+@contextmanager
+def open_maybe_gz(path: str):
+    """Open a file for binary line iteration, decompressing .gz transparently.
+
+    Gzipped files are streamed through `pigz -dc` when available (parallel,
+    out-of-process decompression), otherwise through Python's gzip module.
+    """
+    if not path.endswith(".gz"):
+        with open(path, "rb", buffering=READ_BUFFER) as fh:
+            yield fh
+        return
+
+    pigz = shutil.which("pigz")
+    if pigz is None:
+        with gzip.open(path, "rb") as fh:
+            yield fh
+        return
+
+    proc = subprocess.Popen([pigz, "-dc", path], stdout=subprocess.PIPE, bufsize=PIPE_BUFFER)
+    try:
+        yield proc.stdout
+    except BaseException:
+        proc.kill()
+        raise
+    finally:
+        proc.stdout.close()
+        proc.wait()
+    if proc.returncode != 0:
+        raise RuntimeError(f"pigz -dc failed on {path} (exit code {proc.returncode})")
+
+
+def iter_fasta_bytes(path: str):
+    """Yield (header, sequence) byte pairs from a FASTA file (.gz allowed).
+
+    Headers lose the leading '>' and surrounding whitespace. Multi-line
+    sequences are joined and stripped of whitespace in one pass per record;
+    no case folding is done. Lines before the first header are ignored.
+    """
+    with open_maybe_gz(path) as fh:
+        header = None
+        chunks = []
+        for line in fh:
+            if line[:1] == b">":
+                if header is not None:
+                    yield header, b"".join(chunks).translate(None, WHITESPACE)
+                header = line[1:].strip()
+                chunks = []
+            elif header is not None:
+                chunks.append(line)
+        if header is not None:
+            yield header, b"".join(chunks).translate(None, WHITESPACE)
@@ -7,83 +7,149 @@ or Weak Binders (WB), trims the prepended N-terminal amino acid (added by
 prepare_sequences.py), deduplicates, and writes a FASTA with provenance headers.
 
 Usage:
-    python filter_binders.py <netmhcpan_result> <mpnn_output_dir> <output_fasta>
+    python filter_binders.py <netmhcpan_result> <mpnn_output_dir> <output_fasta> [--sort]
 
 Example:
     python filter_binders.py ./rfd1_netmhcpan_result.txt ../02_proteinmpnn/outputs_rfd1 ./rfd1_filtered.fa
     python filter_binders.py ./rfd3_netmhcpan_result.txt ../02_proteinmpnn/outputs_rfd3 ./rfd3_filtered.fa
+
+Peptides are written in the order they first appear in the NetMHCpan result;
+pass --sort to write them sorted by sequence instead.
+
+Gzipped inputs (NetMHCpan result ending in .gz, MPNN *.fa.gz) are read
+transparently, via pigz when it is on PATH.
 """
 
 import sys
 import os
+import mmap
 import re
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from fasta_utils import FASTA_SUFFIXES, iter_fasta_bytes, open_maybe_gz, walk_fasta
 
+# NetMHCpan BindLevel column: "<= SB" (strong) or "<= WB" (weak)
+SBWB_PATTERN = re.compile(rb"<= [SW]B")
+CHUNK_SIZE = 16 << 20  # 16 MB blocks when a result file cannot be memory-mapped
 
-def get_experiment_name(path: Path) -> str:
-    """Extract experiment name from MPNN output directory structure."""
-    parts = path.parts
+
+def get_experiment_name(directory: str) -> str:
+    """Extract experiment name from the directory holding an MPNN FASTA."""
+    parts = [p for p in directory.split(os.sep) if p and p != "."]
     if "seqs" in parts:
         idx = parts.index("seqs")
         if idx > 0:
             return parts[idx - 1]
-    return path.parent.name
+    return parts[-1] if parts else ""
+
+
+def iter_marked_lines(buf, endpos: int):
+    """Yield each line of buf[:endpos] that carries an SB/WB marker."""
+    pos = 0
+    for match in SBWB_PATTERN.finditer(buf, 0, endpos):
+        hit = match.start()
+        if hit < pos:
+            continue  # second marker on a line already yielded
+        start = buf.rfind(b"\n", 0, hit) + 1
+        end = buf.find(b"\n", hit)
+        if end < 0:
+            end = len(buf)
+        yield buf[start:end]
+        pos = end + 1
+
+
+def iter_binder_lines(path: str):
+    """Yield NetMHCpan result lines flagged as Strong or Weak Binders.
+
+    Plain files are memory-mapped and scanned with a single finditer() over
+    the whole map, so non-binder lines never become Python objects.
+    Gzipped (or empty) files are read in CHUNK_SIZE blocks and each block is
+    scanned the same way, carrying the trailing partial line to the next one.
+    """
+    if path.endswith(".gz") or os.path.getsize(path) == 0:
+        with open_maybe_gz(path) as fh:
+            leftover = b""
+            while True:
+                data = fh.read(CHUNK_SIZE)
+                if not data:
+                    break
+                data = leftover + data
+                cut = data.rfind(b"\n") + 1
+                yield from iter_marked_lines(data, cut)
+                leftover = data[cut:]
+            if leftover:
+                yield from iter_marked_lines(leftover, len(leftover))
+        return
+
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield from iter_marked_lines(mm, len(mm))
+
+
+def index_fasta(fpath: str):
+    """Read one MPNN FASTA. Returns [(seq_bytes, header), ...]."""
+    # Only headers are decoded; sequences stay as upper-cased bytes keys
+    return [
+        (seq.upper(), header.decode("utf-8", "ignore"))
+        for header, seq in iter_fasta_bytes(fpath)
+        if seq and header
+    ]
 
 
 def main():
-    if len(sys.argv) < 4:
-        print("Usage: python filter_binders.py <netmhcpan_result> <mpnn_output_dir> <output_fasta>")
+    args = sys.argv[1:]
+    sort_output = "--sort" in args
+    if sort_output:
+        args.remove("--sort")
+
+    if len(args) < 3:
+        print("Usage: python filter_binders.py <netmhcpan_result> <mpnn_output_dir> <output_fasta> [--sort]")
         sys.exit(1)
 
-    netmhc_file = sys.argv[1]
-    mpnn_dir = sys.argv[2]
-    out_fasta = sys.argv[3]
+    netmhc_file = args[0]
+    mpnn_dir = args[1]
+    out_fasta = args[2]
 
-    # Step 1: Index original MPNN peptides -> headers
+    # Step 1: Index original MPNN peptides -> headers (one file per task)
+    fa_paths, exp_names = [], []
+    exp_name_by_dir = {}  # experiment name resolved once per directory
+
+    for directory, fname in walk_fasta(mpnn_dir, FASTA_SUFFIXES):
+        exp_name = exp_name_by_dir.get(directory)
+        if exp_name is None:
+            exp_name = exp_name_by_dir[directory] = get_experiment_name(directory)
+        fa_paths.append(directory + os.sep + fname)
+        exp_names.append(exp_name)
+
+    # One provenance string per peptide: MPNN headers are near-unique
+    # (per-record sample=/score=), so interning or sharing them saves nothing
     peptide_to_header = {}
-    total_files, total_entries = 0, 0
+    total_files, total_entries = len(fa_paths), 0
 
-    for root, _, files in os.walk(mpnn_dir):
-        for f in sorted(files):
-            if not f.lower().endswith(".fa"):
-                continue
-            total_files += 1
-            fpath = Path(root) / f
-            exp_name = get_experiment_name(fpath)
-
-            with open(fpath, "r", encoding="utf-8", errors="ignore") as fh:
-                header = None
-                for line in fh:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    if line.startswith(">"):
-                        header = line[1:]
-                        continue
-                    seq = line.upper()
-                    if seq and header:
-                        peptide_to_header[seq] = f"{exp_name}__{header}"
-                        total_entries += 1
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        # map() preserves file order, so later files still win on duplicates
+        results = executor.map(index_fasta, fa_paths, chunksize=32)
+        for exp_name, entries in zip(exp_names, results):
+            for seq, header in entries:
+                peptide_to_header[seq] = f"{exp_name}__{header}"
+            total_entries += len(entries)
 
     print(f"[INDEX] {total_files} FASTA files, {total_entries} entries, "
           f"{len(peptide_to_header)} unique peptides")
 
     # Step 2: Parse NetMHCpan results — filter SB/WB, trim N-terminal AA
-    sbwb_trimmed = set()
+    sbwb_trimmed = {}  # insertion-ordered set: dedup while keeping discovery order
     too_short = 0
 
-    with open(netmhc_file, "r", encoding="utf-8", errors="ignore") as f:
-        for line in f:
-            if "<= SB" in line or "<= WB" in line:
-                parts = re.split(r"\s+", line.strip())
-                if len(parts) >= 3:
-                    pep_full = parts[2].upper()
-                    if len(pep_full) < 2:
-                        too_short += 1
-                        continue
-                    pep_orig = pep_full[1:]  # trim prepended AA
-                    if pep_orig:
-                        sbwb_trimmed.add(pep_orig)
+    for line in iter_binder_lines(netmhc_file):
+        parts = line.split(None, 3)
+        if len(parts) >= 3:
+            pep_full = parts[2].upper()
+            if len(pep_full) < 2:
+                too_short += 1
+                continue
+            pep_orig = pep_full[1:]  # trim prepended AA
+            if pep_orig:
+                sbwb_trimmed[pep_orig] = None
 
     print(f"[FILTER] {len(sbwb_trimmed)} unique SB/WB peptides after trimming")
 
@@ -93,8 +159,9 @@ def main():
 
     with open(out_fasta, "w") as out:
         count = 0
-        for pep in sorted(sbwb_trimmed):
-            hdr = peptide_to_header.get(pep)
+        for pep_b in (sorted(sbwb_trimmed) if sort_output else sbwb_trimmed):
+            pep = pep_b.decode()
+            hdr = peptide_to_header.get(pep_b)
             if hdr is None:
                 hdr = f"unmapped__{pep}"
                 unmapped += 1
@@ -2,10 +2,11 @@
 """
 Prepare ProteinMPNN sequences for NetMHCpan binding prediction.
 
-Reads all FASTA files from ProteinMPNN output, skips the first (reference)
-sequence from each file, and prepends each of 20 standard amino acids to
-every designed peptide. This N-terminal expansion allows NetMHCpan to evaluate
-all possible P1 anchor variants for MHC-I binding.
+Reads all FASTA files (.fa, .fa.gz) from ProteinMPNN output, skips the first
+(reference) sequence from each file, and prepends each of 20 standard amino
+acids to every unique designed peptide (duplicates across files are expanded
+once). This N-terminal expansion allows NetMHCpan to evaluate all possible P1
+anchor variants for MHC-I binding.
 
 Usage:
     python prepare_sequences.py <mpnn_output_dir> <output_fasta>
@@ -18,7 +19,11 @@ Example:
 import sys
 import os
 
-AA_LIST = list("ACDEFGHIKLMNPQRSTVWY")
+from fasta_utils import iter_fasta_bytes, walk_fasta
+
+AA_BYTES = b"ACDEFGHIKLMNPQRSTVWY"
+AA_PREFIXES = [AA_BYTES[i:i + 1] for i in range(len(AA_BYTES))]
+WRITE_BUFFER = 1 << 22  # 4 MB output buffer
 
 
 def main():
@@ -35,40 +40,34 @@ def main():
 
     os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
 
-    all_seqs = []
-
-    for root, _, files in os.walk(input_root):
-        for fname in sorted(files):
-            if not fname.endswith(".fa"):
-                continue
-            in_path = os.path.join(root, fname)
-
-            first_header_seen = False
-            drop_next_seq_line = False
-
-            with open(in_path, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    if line.startswith(">"):
-                        if not first_header_seen:
-                            first_header_seen = True
-                            drop_next_seq_line = True
-                        continue
-
-                    if drop_next_seq_line:
-                        drop_next_seq_line = False
-                        continue
-
-                    for aa in AA_LIST:
-                        all_seqs.append(aa + line)
-
-    with open(out_path, "w") as out:
-        out.write("\n".join(all_seqs) + ("\n" if all_seqs else ""))
-
-    print(f"Prepared {len(all_seqs)} sequences -> {out_path}")
+    n_seqs = 0
+    n_peptides = 0
+    seen = set()  # designed peptides already expanded (MPNN repeats across files)
+
+    # Stream expanded peptides straight to disk instead of buffering 20xN strings
+    with open(out_path, "wb", buffering=WRITE_BUFFER) as out:
+        for directory, fname in walk_fasta(input_root):
+            records = iter_fasta_bytes(directory + os.sep + fname)
+            next(records, None)  # first record is the MPNN reference sequence
+
+            for _, seq in records:
+                if not seq:
+                    continue
+
+                n_peptides += 1
+                if seq in seen:
+                    continue
+                seen.add(seq)
+
+                # "A" + seq\n + "C" + seq\n + ... + "Y" + seq\n in one C-level join
+                sep = seq + b"\n"
+                out.write(sep.join(AA_PREFIXES) + sep)
+                n_seqs += len(AA_PREFIXES)
+
+    n_dup = n_peptides - len(seen)
+    print(f"Skipped {n_dup}/{n_peptides} duplicate peptides "
+          f"({len(seen)} unique, {n_dup / max(n_peptides, 1):.1%} redundant)")
+    print(f"Prepared {n_seqs} sequences -> {out_path}")
 
 
 if __name__ == "__main__":
@@ -7,16 +7,43 @@ a rosetta_scripts command that threads the sequence onto the backbone using
 SimpleThreadingMover.
 
 Usage:
-    python prepare_threading.py <filtered.fa> <pdb_dir> <output_dir>
+    python prepare_threading.py <filtered.fa> <pdb_dir> <output_dir> [--shards N]
 
 Example:
     python prepare_threading.py ../03_netmhcpan/rfd1_filtered.fa ../01_rfdiffusion1/outputs ./outputs_rfd1
     python prepare_threading.py ../03_netmhcpan/rfd3_filtered.fa ../02_proteinmpnn/inputs_rfd3 ./outputs_rfd3
+
+With --shards N, commands are also dealt round-robin into
+threading_commands.0000.txt ... threading_commands.<N-1>.txt and a run_all.sh
+is written that runs the shards N at a time with xargs -P (from this directory):
+    bash ./outputs_rfd1/run_all.sh
 """
 
 import sys
 import os
+import glob
 from collections import defaultdict
+from contextlib import ExitStack
+
+WRITE_BUFFER = 1 << 22  # 4 MB command-file buffer
+
+# Fixed pieces of each rosetta_scripts command, as bytes
+CMD_START = b"rosetta_scripts -in:file:s "
+CMD_SEQUENCE = b" -parser:protocol thread.xml -parser:script_vars sequence="
+CMD_PREFIX = b" -out:prefix "
+
+SHARD_PATTERN = "threading_commands.{:04d}.txt"
+SHARD_GLOB = "threading_commands.[0-9][0-9][0-9][0-9].txt"
+RUN_ALL_NAME = "run_all.sh"
+
+RUN_ALL_TEMPLATE = """#!/bin/bash
+# Run all threading command shards, {n_shards} at a time.
+# Generated by prepare_threading.py; run from 04_rosetta_thread/:
+#   bash {output_dir}/run_all.sh
+set -euo pipefail
+SHARD_DIR="$(cd "$(dirname "${{BASH_SOURCE[0]}}")" && pwd)"
+printf '%s\\n' "${{SHARD_DIR}}"/{shard_glob} | xargs -I{{}} -P {n_shards} bash {{}}
+"""
 
 
 def header_to_pdb_stem(header: str) -> str:
@@ -30,14 +57,37 @@ def header_to_pdb_stem(header: str) -> str:
     return stem
 
 
+def write_run_all(output_dir: str, n_shards: int) -> str:
+    """Write run_all.sh that executes the command shards in parallel."""
+    script = os.path.join(output_dir, RUN_ALL_NAME)
+    with open(script, "w") as fh:
+        fh.write(RUN_ALL_TEMPLATE.format(
+            n_shards=n_shards, output_dir=output_dir, shard_glob=SHARD_GLOB))
+    os.chmod(script, 0o755)
+    return script
+
+
 def main():
-    if len(sys.argv) < 4:
-        print("Usage: python prepare_threading.py <filtered.fa> <pdb_dir> <output_dir>")
+    args = sys.argv[1:]
+    n_shards = 0
+    if "--shards" in args:
+        i = args.index("--shards")
+        try:
+            n_shards = int(args[i + 1])
+        except (IndexError, ValueError):
+            n_shards = 0
+        if n_shards < 1:
+            print("ERROR: --shards expects a positive integer")
+            sys.exit(1)
+        del args[i:i + 2]
+
+    if len(args) < 3:
+        print("Usage: python prepare_threading.py <filtered.fa> <pdb_dir> <output_dir> [--shards N]")
         sys.exit(1)
 
-    fasta_path = sys.argv[1]
-    pdb_dir = sys.argv[2]
-    output_dir = sys.argv[3]
+    fasta_path = args[0]
+    pdb_dir = args[1]
+    output_dir = args[2]
 
     if not os.path.isfile(fasta_path):
         print(f"ERROR: Filtered FASTA not found: {fasta_path}")
@@ -49,21 +99,45 @@ def main():
 
     os.makedirs(output_dir, exist_ok=True)
 
+    # One directory scan instead of a stat() per FASTA record
+    with os.scandir(pdb_dir) as it:
+        available = {e.name[:-4] for e in it if e.name.endswith(".pdb") and e.is_file()}
+
     # Track local index per PDB (multiple peptides may map to same backbone)
     per_pdb_count = defaultdict(int)
     n_commands = 0
     missing = []
-    commands = []
 
-    with open(fasta_path, "r") as fin:
+    # Stream commands straight to the command file as records are read
+    cmd_file = os.path.join(output_dir, "threading_commands.txt")
+
+    # Per-stem "rosetta_scripts ... sequence=" head and per-index "-out:prefix" tail
+    cmd_heads = {}
+    cmd_tails = {}
+
+    # Drop shards and runner from earlier runs; both are rewritten only when sharding
+    stale_files = glob.glob(os.path.join(output_dir, SHARD_GLOB))
+    stale_files.append(os.path.join(output_dir, RUN_ALL_NAME))
+    for stale in stale_files:
+        if os.path.isfile(stale):
+            os.remove(stale)
+
+    with ExitStack() as stack:
+        fin = stack.enter_context(open(fasta_path, "rb"))
+        fout = stack.enter_context(open(cmd_file, "wb", buffering=WRITE_BUFFER))
+        shards = [
+            stack.enter_context(open(os.path.join(output_dir, SHARD_PATTERN.format(i)), "wb"))
+            for i in range(n_shards)
+        ]
+
         header = None
         for line in fin:
             line = line.strip()
             if not line:
                 continue
 
-            if line.startswith(">"):
-                header = line[1:]
+            if line.startswith(b">"):
+                header = line[1:].decode()
                 continue
 
             seq = line
@@ -71,34 +145,37 @@ def main():
                 raise RuntimeError("FASTA format error: sequence before header")
 
             pdb_stem = header_to_pdb_stem(header)
-            pdb_path = os.path.join(pdb_dir, pdb_stem + ".pdb")
 
-            if not os.path.isfile(pdb_path):
+            if pdb_stem not in available:
                 missing.append(pdb_stem)
                 continue
 
+            head = cmd_heads.get(pdb_stem)
+            if head is None:
+                pdb_path = os.path.join(pdb_dir, pdb_stem + ".pdb")
+                head = cmd_heads[pdb_stem] = CMD_START + os.fsencode(pdb_path) + CMD_SEQUENCE
+
             per_pdb_count[pdb_stem] += 1
             local_idx = per_pdb_count[pdb_stem]
 
-            prefix = os.path.join(output_dir, f"threaded_{local_idx}_")
+            tail = cmd_tails.get(local_idx)
+            if tail is None:
+                prefix = os.path.join(output_dir, f"threaded_{local_idx}_")
+                tail = cmd_tails[local_idx] = CMD_PREFIX + os.fsencode(prefix) + b"\n"
 
-            cmd = (
-                f"rosetta_scripts -in:file:s {pdb_path} "
-                f"-parser:protocol thread.xml "
-                f"-parser:script_vars sequence={seq} "
-                f"-out:prefix {prefix}"
-            )
-            commands.append(cmd)
+            cmd = head + seq + tail
+            fout.write(cmd)
+            if shards:
+                shards[n_commands % n_shards].write(cmd)
             n_commands += 1
 
-    # Write command file
-    cmd_file = os.path.join(output_dir, "threading_commands.txt")
-    with open(cmd_file, "w") as fout:
-        fout.write("\n".join(commands) + "\n")
-
     print(f"Generated {n_commands} threading commands -> {cmd_file}")
     print(f"Unique PDB backbones: {len(per_pdb_count)}")
 
+    if n_shards:
+        run_all = write_run_all(output_dir, n_shards)
+        print(f"Sharded into {n_shards} files ({SHARD_GLOB}) -> {run_all}")
+
     if missing:
         unique_missing = set(missing)
         print(f"WARNING: {len(unique_missing)} PDB stems not found (skipped).")
@@ -22,6 +22,11 @@
 # SLURM submission:
 #   sbatch --partition=day --cpus-per-task=1 --mem=8g --time=02:00:00 \
 #          --wrap="cd 04_rosetta_thread && bash run_rosetta_thread.sh rfd1"
+#
+# Parallel execution (N shards run concurrently via xargs -P):
+#   python prepare_threading.py ../03_netmhcpan/rfd1_filtered.fa \
+#          ../01_rfdiffusion1/outputs ./outputs_rfd1 --shards 8
+#   bash ./outputs_rfd1/run_all.sh
 # =============================================================================
 
 set -euo pipefail